@@ -8,8 +8,13 @@ import sys
 import json
 import argparse
 import os
+from dataclasses import asdict
 from models.analyzer import PythonAnalyzer
-import requests
+from models.events import AnalysisEventStream
+from models.providers import (
+    DEFAULT_MODEL, PROVIDERS, UNPARSED_CODE, RoutingProvider, create_provider, parse_response
+)
+from concurrent.futures import ThreadPoolExecutor
 
 def colorize(text, color="green", use_colors=True):
     """Colorize text using ANSI escape codes"""
@@ -25,28 +30,49 @@ def colorize(text, color="green", use_colors=True):
     }
     return f"{colors.get(color, '')}{text}{colors['reset']}"
 
+def positive_int(value):
+    """Argparse type for options that must be a whole number of at least 1"""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
 def build_parser():
     """Build and return the argument parser"""
     parser = argparse.ArgumentParser(description='AI Code Mentor CLI - Analyze Python code')
-    parser.add_argument('file', help='Python file to analyze')
+    parser.add_argument('files', nargs='+', metavar='file', help='Python file(s) to analyze')
     parser.add_argument('--api-key', help='OpenAI API key')
     parser.add_argument('--gpt', action='store_true', help='Get GPT-4 suggestions')
-    parser.add_argument('--json', action='store_true', help='Output results as JSON')
+    parser.add_argument('--provider', choices=[*PROVIDERS, 'auto'], default='openai',
+                       help="Suggestion backend; 'auto' routes cheap files to the rule-based backend (default: openai)")
+    parser.add_argument('--base-url', help='Base URL of an OpenAI-compatible endpoint')
+    parser.add_argument('--model', default=DEFAULT_MODEL, help=f'Model name (default: {DEFAULT_MODEL})')
+    parser.add_argument('--max-concurrency', type=positive_int, help='Maximum concurrent suggestion requests')
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument('--json', action='store_true', help='Output results as JSON')
+    output.add_argument('--events', action='store_true',
+                        help='Stream versioned analysis events as JSON lines')
+    parser.add_argument('--stdin', action='store_true',
+                        help='Read the source of a single file from stdin; the file argument only names it')
     parser.add_argument('-v', '--verbose', action='store_true', help='Enable verbose output')
     parser.add_argument('--color', choices=['auto', 'always', 'never'], default='auto', 
                        help='Colorize output (default: auto)')
     return parser
 
 class AICodeMentorCLI:
-    def __init__(self, openai_api_key=None):
+    def __init__(self, openai_api_key=None, provider='openai', base_url=None,
+                 model=DEFAULT_MODEL, max_concurrency=None):
         self.analyzer = PythonAnalyzer()
         self.openai_api_key = openai_api_key or os.getenv('OPENAI_API_KEY')
+        self.provider = create_provider(provider, self.openai_api_key, base_url, model,
+                                        max_concurrency, self.analyzer)
     
-    def analyze_file(self, file_path):
-        """Analyze a Python file and return results"""
+    def analyze_file(self, file_path, code=None):
+        """Analyze a Python file (or the given source for it) and return results"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                code = f.read()
+            if code is None:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    code = f.read()
             
             result = self.analyzer.analyze_code(code, file_path)
             return result
@@ -57,102 +83,24 @@ class AICodeMentorCLI:
             print(f"Error analyzing file: {e}")
             return None
     
-    def get_gpt_suggestions(self, code, context=""):
-        """Get GPT-4 suggestions for code"""
-        if not self.openai_api_key:
-            print("Warning: No OpenAI API key provided. Skipping GPT suggestions.")
-            return None
-        
-        try:
-            headers = {
-                "Authorization": f"Bearer {self.openai_api_key}",
-                "Content-Type": "application/json"
-            }
-            
-            prompt = f"""
-Please analyze this Python code and provide:
-
-1. **Improved Code**: A cleaner, more efficient version of the code
-2. **Time Complexity**: O() notation and explanation
-3. **Space Complexity**: O() notation and explanation  
-4. **What the code is doing**: Clear explanation of the code's purpose and logic
-5. **Suggestions**: 2-3 specific improvements for code quality, readability, or performance
-
-Code to analyze:
-```python
-{code}
-```
-
-{context}
-
-Please format your response as JSON with the following structure:
-{{
-    "improvedCode": "your improved code here",
-    "timeComplexity": "O(n) - explanation",
-    "spaceComplexity": "O(1) - explanation", 
-    "explanation": "what the code does",
-    "suggestions": ["suggestion 1", "suggestion 2", "suggestion 3"]
-}}
-"""
-            
-            data = {
-                "model": "gpt-4",
-                "messages": [
-                    {
-                        "role": "system",
-                        "content": "You are an expert Python code reviewer and mentor. Provide clear, actionable feedback with code examples."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                "temperature": 0.3,
-                "max_tokens": 2000
+    def get_gpt_suggestions(self, code, context="", analysis=None):
+        """Get suggestions for code from the configured provider"""
+        return self.provider.suggest(code, context, analysis)
+    
+    def provider_metrics(self):
+        """Latency summaries keyed by backend name"""
+        if isinstance(self.provider, RoutingProvider):
+            by_backend = self.provider.metrics_by_backend()
+            return {
+                self.provider.name: by_backend["routed"],
+                self.provider.remote.name: by_backend["remote"],
+                self.provider.fallback.name: by_backend["fallback"],
             }
-            
-            response = requests.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers=headers,
-                json=data
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                content = result['choices'][0]['message']['content']
-                return self.parse_gpt_response(content)
-            else:
-                print(f"Error calling OpenAI API: {response.status_code}")
-                return None
-                
-        except Exception as e:
-            print(f"Error getting GPT suggestions: {e}")
-            return None
+        return {self.provider.name: self.provider.metrics.summary()}
     
     def parse_gpt_response(self, response):
         """Parse GPT response and extract JSON"""
-        try:
-            json_match = response.find('{')
-            if json_match != -1:
-                json_str = response[json_match:]
-                parsed = json.loads(json_str)
-                return {
-                    "improvedCode": parsed.get("improvedCode", "No improved code provided"),
-                    "timeComplexity": parsed.get("timeComplexity", "Not analyzed"),
-                    "spaceComplexity": parsed.get("spaceComplexity", "Not analyzed"),
-                    "explanation": parsed.get("explanation", "No explanation provided"),
-                    "suggestions": parsed.get("suggestions", [])
-                }
-        except Exception as e:
-            print(f"Warning: Failed to parse GPT response: {e}")
-        
-        return {
-            "improvedCode": "Unable to parse improved code from response",
-            "timeComplexity": "Not analyzed",
-            "spaceComplexity": "Not analyzed",
-            "explanation": response,
-            "suggestions": ["Review the response manually for suggestions"]
-        }
+        return parse_response(response)
     
     def print_analysis(self, analysis_result):
         """Print analysis results in a nice format"""
@@ -167,6 +115,9 @@ Please format your response as JSON with the following structure:
         print(f"📊 Total Lines: {analysis_result.total_lines}")
         print(f"🎯 Complexity Score: {analysis_result.complexity_score:.1f}")
         
+        if analysis_result.budget_exceeded:
+            print(f"⏳ Budget Exceeded: {analysis_result.budget_exceeded} (token-level scan only)")
+        
         if analysis_result.functions:
             print(f"\n🔍 Functions Found: {len(analysis_result.functions)}")
             for func in analysis_result.functions:
@@ -191,7 +142,8 @@ Please format your response as JSON with the following structure:
             return
         
         print("\n" + "="*60)
-        print("🧠 GPT-4 SUGGESTIONS")
+        label = getattr(self.provider, "model", None) or self.provider.name
+        print(f"🧠 {label.upper()} SUGGESTIONS")
         print("="*60)
         
         print(f"\n📝 Explanation:")
@@ -208,7 +160,7 @@ Please format your response as JSON with the following structure:
             for i, suggestion in enumerate(gpt_result['suggestions'], 1):
                 print(f"  {i}. {suggestion}")
         
-        if gpt_result['improvedCode'] and gpt_result['improvedCode'] != "Unable to parse improved code from response":
+        if gpt_result['improvedCode'] and gpt_result['improvedCode'] != UNPARSED_CODE:
             print(f"\n✨ Improved Code:")
             print("```python")
             print(gpt_result['improvedCode'])
@@ -223,38 +175,70 @@ def main():
                   (args.color == 'auto' and hasattr(sys.stdout, 'isatty') and sys.stdout.isatty()))
     
     if args.verbose:
-        print(colorize("Verbose mode enabled", "green", use_colors))
+        # Diagnostics go to stderr so --json and --events output stay machine-readable
+        print(colorize("Verbose mode enabled", "green", use_colors), file=sys.stderr)
     
     # Initialize CLI
-    cli = AICodeMentorCLI(args.api_key)
-    
-    # Analyze file
-    analysis = cli.analyze_file(args.file)
-    
-    if not analysis:
-        sys.exit(1)
-    
-    # Always output JSON summary to stdout after analysis completes
-    insights = []
-    if args.verbose:
-        insights.append("Flag --verbose on")
-    insights.append(f"Color mode: {args.color}")
-    
-    summary = {"insights": insights}
-    print(json.dumps(summary))
+    try:
+        cli = AICodeMentorCLI(args.api_key, args.provider, args.base_url, args.model, args.max_concurrency)
+    except ValueError as e:
+        parser.error(str(e))
     
-    if args.json:
-        # Output as JSON
-        print(json.dumps(analysis, indent=2, default=lambda x: x.__dict__))
-    else:
-        # Print formatted results
-        cli.print_analysis(analysis)
+    # Closing the analyzer stops its worker process, also on sys.exit
+    with cli.analyzer:
+        sources = {}
+        if args.stdin:
+            if len(args.files) != 1:
+                parser.error("--stdin takes exactly one file name")
+            sources[args.files[0]] = sys.stdin.read()
         
-        # Get GPT suggestions if requested
+        if args.events:
+            # Stream events as JSON lines; nothing else may be written to stdout
+            stream = AnalysisEventStream(sys.stdout, cli.analyzer)
+            results = stream.run(args.files, sources, verbose=args.verbose, color=args.color)
+            if len(results) != len(args.files):
+                sys.exit(1)
+            return
+        
+        # Analyze files
+        analyses = []
+        for file_path in args.files:
+            analysis = cli.analyze_file(file_path, sources.get(file_path))
+            if not analysis:
+                sys.exit(1)
+            analyses.append(analysis)
+        
+        # Get suggestions for every file concurrently if requested
+        gpt_results = [None] * len(analyses)
         if args.gpt:
-            with open(args.file, 'r', encoding='utf-8') as f:
-                code = f.read()
-            gpt_result = cli.get_gpt_suggestions(code, f"Analyzing file: {args.file}")
+            def suggest(item):
+                file_path, analysis = item
+                code = sources.get(file_path)
+                if code is None:
+                    with open(file_path, 'r', encoding='utf-8') as f:
+                        code = f.read()
+                return cli.get_gpt_suggestions(code, f"Analyzing file: {file_path}", analysis)
+            
+            with ThreadPoolExecutor(max_workers=cli.provider.max_concurrency) as executor:
+                gpt_results = list(executor.map(suggest, zip(args.files, analyses)))
+            
+            if args.verbose:
+                for backend, summary in cli.provider_metrics().items():
+                    print(f"Provider '{backend}' latency: {json.dumps(summary)}", file=sys.stderr)
+        
+        if args.json:
+            # Output as JSON (a single object for one file, a list for several);
+            # with --gpt each object also carries its gptSuggestions
+            output = [asdict(analysis) for analysis in analyses]
+            if args.gpt:
+                for item, gpt_result in zip(output, gpt_results):
+                    item["gptSuggestions"] = gpt_result
+            print(json.dumps(output[0] if len(output) == 1 else output, indent=2))
+            return
+        
+        for analysis, gpt_result in zip(analyses, gpt_results):
+            # Print formatted results
+            cli.print_analysis(analysis)
             cli.print_gpt_suggestions(gpt_result)
 
 if __name__ == "__main__":
@@ -5,10 +5,28 @@ Analyzes Python code for code quality issues and provides structured feedback.
 """
 
 import ast
+import io
 import json
+import multiprocessing
 import sys
-from typing import Dict, List, Any, Optional
-from dataclasses import dataclass, asdict
+import tokenize
+from typing import Dict, List, Any, Optional, Union
+from dataclasses import dataclass, asdict, replace
+
+
+# Names reported in AnalysisResult.budget_exceeded
+BUDGET_MAX_BYTES = 'max_bytes'
+BUDGET_MAX_AST_DEPTH = 'max_ast_depth'
+BUDGET_MAX_NODES = 'max_nodes'
+BUDGET_TIME_LIMIT = 'time_limit'
+PARSER_OUT_OF_MEMORY = 'parser_out_of_memory'
+WORKER_CRASHED = 'worker_crashed'
+
+# Statement keywords that add a branch in the token scan; only counted when they
+# start a logical line, so comprehensions and conditional expressions are skipped
+# just like in the AST path
+_BRANCH_STATEMENTS = {'if', 'elif', 'for', 'while', 'except'}
+_BOOL_OPERATORS = {'and', 'or'}
 
 
 @dataclass
@@ -43,21 +61,111 @@ class AnalysisResult:
     issues: List[CodeIssue]
     complexity_score: float
     suggestions: List[str]
+    analysis_mode: str = 'ast'  # 'ast' or 'tokens'
+    budget_exceeded: Optional[str] = None  # budget that forced the token scan, if any
+    max_loop_depth: int = 0  # deepest loop/comprehension nesting; only computed from the AST
+
+
+@dataclass
+class AnalysisBudget:
+    """Per-file resource limits; a file over any of them gets a token-level scan instead."""
+    max_bytes: int = 1_000_000
+    max_ast_depth: int = 200
+    max_nodes: int = 200_000
+    time_limit: Optional[float] = 10.0  # seconds, enforced in a worker process; None runs in-process
+
+
+def _worker_main(conn, max_function_lines: int, max_nested_loops: int, budget: AnalysisBudget) -> None:
+    """Serve analysis requests from the parent until the pipe is closed."""
+    analyzer = PythonAnalyzer(max_function_lines, max_nested_loops, replace(budget, time_limit=None))
+    conn.send('ready')
+    while True:
+        try:
+            code, file_path = conn.recv()
+        except EOFError:
+            break
+        try:
+            result = analyzer.analyze_code(code, file_path)
+        except Exception as e:
+            result = e
+        conn.send(result)
+
+
+class _AnalysisWorker:
+    """Long-lived child process running AST analysis, so a file that overruns can be abandoned."""
+
+    def __init__(self, max_function_lines: int, max_nested_loops: int, budget: AnalysisBudget):
+        self._args = (max_function_lines, max_nested_loops, budget)
+        self._process = None
+        self._conn = None
+
+    def run(self, code: str, file_path: str, timeout: float) -> Any:
+        """Return the worker's AnalysisResult, or a budget name if it timed out or died."""
+        try:
+            self.start()
+
+            # The clock starts only once the worker is up, so startup is not billed to the file
+            self._conn.send((code, file_path))
+            if not self._conn.poll(timeout):
+                self.close()
+                return BUDGET_TIME_LIMIT
+            result = self._conn.recv()
+        except (EOFError, OSError):
+            self.close()
+            return WORKER_CRASHED
+
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def start(self) -> None:
+        """Start the child process if it is not already running."""
+        if self._process is not None and self._process.is_alive():
+            return
+        self.close()
+        parent_conn, child_conn = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(
+            target=_worker_main, args=(child_conn, *self._args), daemon=True
+        )
+        self._process.start()
+        child_conn.close()
+        self._conn = parent_conn
+        self._conn.recv()  # wait for the worker's ready message
+
+    def close(self) -> None:
+        if self._process is not None:
+            self._process.terminate()
+            self._process.join()
+            self._conn.close()
+        self._process = None
+        self._conn = None
 
 
 class PythonAnalyzer:
     """Main analyzer class that uses AST to analyze Python code."""
     
-    def __init__(self, max_function_lines: int = 30, max_nested_loops: int = 3):
+    def __init__(self, max_function_lines: int = 30, max_nested_loops: int = 3,
+                 budget: Optional[AnalysisBudget] = None):
         self.max_function_lines = max_function_lines
         self.max_nested_loops = max_nested_loops
+        self.budget = budget or AnalysisBudget()
         self.issues: List[CodeIssue] = []
         self.functions: List[FunctionInfo] = []
+        self._worker: Optional[_AnalysisWorker] = None
+    
+    def __enter__(self) -> 'PythonAnalyzer':
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
     
     def analyze_code(self, code: str, file_path: str = "unknown") -> AnalysisResult:
         """
         Analyze Python code and return structured analysis results.
         
+        Files over the analyzer's budget fall back to a token-level scan, and
+        the result's budget_exceeded field names the limit that tripped.
+        
         Args:
             code: Python source code as string
             file_path: Path to the file being analyzed
@@ -68,8 +176,52 @@ class PythonAnalyzer:
         self.issues = []
         self.functions = []
         
+        if len(code.encode('utf-8')) > self.budget.max_bytes:
+            return self._token_scan(code, file_path, BUDGET_MAX_BYTES)
+        
+        if not self._uses_worker():
+            return self._analyze_within_budget(code, file_path)
+        
+        self.start()
+        result = self._worker.run(code, file_path, self.budget.time_limit)
+        if isinstance(result, str):
+            return self._token_scan(code, file_path, result)
+        
+        self.issues = result.issues
+        self.functions = result.functions
+        return result
+    
+    def start(self) -> None:
+        """
+        Start the worker process that enforces the time limit, if one is used.
+        
+        analyze_code starts it on demand; calling this first keeps the process
+        startup out of the timing of the first file.
+        """
+        if not self._uses_worker():
+            return
+        if self._worker is None:
+            self._worker = _AnalysisWorker(self.max_function_lines, self.max_nested_loops, self.budget)
+        self._worker.start()
+    
+    def close(self) -> None:
+        """Stop the worker process used to enforce the time limit."""
+        if self._worker is not None:
+            self._worker.close()
+            self._worker = None
+    
+    def _uses_worker(self) -> bool:
+        # Daemonic processes (e.g. multiprocessing.Pool workers) cannot start a
+        # worker of their own; there the caller's pool owns the time limit
+        return self.budget.time_limit is not None and not multiprocessing.current_process().daemon
+    
+    def _analyze_within_budget(self, code: str, file_path: str) -> AnalysisResult:
+        """Parse and analyze the AST, checking the depth and node budgets first."""
         try:
             tree = ast.parse(code)
+            tripped = self._check_tree_budget(tree)
+            if tripped:
+                return self._token_scan(code, file_path, tripped)
             self._analyze_ast(tree, code)
             
             return AnalysisResult(
@@ -78,7 +230,8 @@ class PythonAnalyzer:
                 functions=self.functions,
                 issues=self.issues,
                 complexity_score=self._calculate_complexity_score(),
-                suggestions=self._generate_suggestions()
+                suggestions=self._generate_suggestions(),
+                max_loop_depth=self._max_loop_depth(tree)
             )
         except SyntaxError as e:
             # Handle syntax errors
@@ -97,57 +250,151 @@ class PythonAnalyzer:
                 complexity_score=0.0,
                 suggestions=["Fix syntax errors before analysis"]
             )
+        except RecursionError:
+            # The parser itself gave up on deeply nested input
+            return self._token_scan(code, file_path, BUDGET_MAX_AST_DEPTH)
+        except MemoryError:
+            return self._token_scan(code, file_path, PARSER_OUT_OF_MEMORY)
+    
+    def _check_tree_budget(self, tree: ast.AST) -> Optional[str]:
+        """Return the name of the first depth/node budget the tree exceeds, if any."""
+        nodes = 0
+        stack = [(tree, 1)]
+        while stack:
+            node, depth = stack.pop()
+            nodes += 1
+            if nodes > self.budget.max_nodes:
+                return BUDGET_MAX_NODES
+            if depth > self.budget.max_ast_depth:
+                return BUDGET_MAX_AST_DEPTH
+            stack.extend((child, depth + 1) for child in ast.iter_child_nodes(node))
+        return None
+    
+    def _token_scan(self, code: str, file_path: str, tripped: str) -> AnalysisResult:
+        """Cheap fallback analysis that finds functions and loops from the token stream."""
+        self.issues = [CodeIssue(
+            line=1,
+            column=0,
+            severity='info',
+            message=f"Analysis budget '{tripped}' exceeded; fell back to a token-level scan",
+            issue_type='budget_exceeded'
+        )]
+        self.functions = []
+        
+        open_functions = []  # [name, line_start, column, indent, complexity, loops]
+        indent = 0
+        last_line = 1
+        at_line_start = True
+        previous = ''
+        
+        def close_functions(level: int) -> None:
+            while open_functions and open_functions[-1][3] >= level:
+                name, line_start, column, _, complexity, loops = open_functions.pop()
+                self._add_function(name, line_start, last_line, column, complexity, loops)
+        
+        try:
+            for tok in tokenize.generate_tokens(io.StringIO(code).readline):
+                if tok.type == tokenize.INDENT:
+                    indent += 1
+                    continue
+                if tok.type == tokenize.DEDENT:
+                    indent -= 1
+                    continue
+                if tok.type == tokenize.NEWLINE:
+                    at_line_start = True
+                    continue
+                if tok.type in (tokenize.NL, tokenize.COMMENT, tokenize.ENDMARKER):
+                    continue
+                
+                starts_statement = at_line_start
+                if at_line_start:
+                    # A statement at or left of a def's indent ends that function
+                    close_functions(indent)
+                    at_line_start = False
+                
+                if tok.type == tokenize.NAME:
+                    if previous == 'def':
+                        open_functions.append([tok.string, tok.start[0], tok.start[1], indent, 1, 0])
+                    elif open_functions and (tok.string in _BOOL_OPERATORS or
+                                             (starts_statement and tok.string in _BRANCH_STATEMENTS)):
+                        open_functions[-1][4] += 1
+                        if tok.string in ('for', 'while'):
+                            open_functions[-1][5] += 1
+                
+                if tok.string == 'async' and starts_statement:
+                    # 'async for' is still a loop statement
+                    at_line_start = True
+                
+                previous = tok.string
+                last_line = tok.end[0]
+        except (tokenize.TokenError, IndentationError):
+            pass
+        close_functions(0)
+        self.functions.sort(key=lambda f: f.line_start)
+        
+        return AnalysisResult(
+            file_path=file_path,
+            total_lines=len(code.splitlines()),
+            functions=self.functions,
+            issues=self.issues,
+            complexity_score=self._calculate_complexity_score(),
+            suggestions=self._generate_suggestions(),
+            analysis_mode='tokens',
+            budget_exceeded=tripped
+        )
     
     def _analyze_ast(self, tree: ast.AST, code: str) -> None:
         """Recursively analyze AST nodes."""
         for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef):
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
                 self._analyze_function(node, code)
-            elif isinstance(node, (ast.For, ast.While)):
+            elif isinstance(node, (ast.For, ast.AsyncFor, ast.While)):
                 self._analyze_loop(node)
     
-    def _analyze_function(self, node: ast.FunctionDef, code: str) -> None:
+    def _analyze_function(self, node: Union[ast.FunctionDef, ast.AsyncFunctionDef], code: str) -> None:
         """Analyze a function definition."""
-        lines = code.splitlines()
-        function_code = '\n'.join(lines[node.lineno - 1:node.end_lineno])
-        
-        # Count lines in function
-        line_count = node.end_lineno - node.lineno + 1
-        
         # Analyze nested loops
         nested_loops = self._count_nested_loops(node)
         
         # Calculate complexity (simplified)
         complexity = self._calculate_function_complexity(node)
         
+        self._add_function(node.name, node.lineno, node.end_lineno, node.col_offset, complexity, nested_loops)
+    
+    def _add_function(self, name: str, line_start: int, line_end: int, column: int,
+                      complexity: int, nested_loops: int) -> None:
+        """Record a function and flag it if it exceeds the configured limits."""
+        # Count lines in function
+        line_count = line_end - line_start + 1
+        
         # Check for issues
         function_issues = []
         
         if line_count > self.max_function_lines:
             function_issues.append(CodeIssue(
-                line=node.lineno,
-                column=node.col_offset,
+                line=line_start,
+                column=column,
                 severity='warning',
-                message=f"Function '{node.name}' is {line_count} lines long (max: {self.max_function_lines})",
+                message=f"Function '{name}' is {line_count} lines long (max: {self.max_function_lines})",
                 issue_type='long_function',
                 suggestion="Consider breaking this function into smaller functions"
             ))
         
         if nested_loops > self.max_nested_loops:
             function_issues.append(CodeIssue(
-                line=node.lineno,
-                column=node.col_offset,
+                line=line_start,
+                column=column,
                 severity='warning',
-                message=f"Function '{node.name}' has {nested_loops} nested loops (max: {self.max_nested_loops})",
+                message=f"Function '{name}' has {nested_loops} nested loops (max: {self.max_nested_loops})",
                 issue_type='nested_loops',
                 suggestion="Consider refactoring to reduce nesting"
             ))
         
         # Add function info
         function_info = FunctionInfo(
-            name=node.name,
-            line_start=node.lineno,
-            line_end=node.end_lineno,
+            name=name,
+            line_start=line_start,
+            line_end=line_end,
             line_count=line_count,
             complexity=complexity,
             nested_loops=nested_loops,
@@ -175,22 +422,34 @@ class PythonAnalyzer:
         """Count nested loops within a function."""
         count = 0
         for child in ast.walk(node):
-            if isinstance(child, (ast.For, ast.While)):
+            if isinstance(child, (ast.For, ast.AsyncFor, ast.While)):
                 count += 1
         return count
     
-    def _calculate_function_complexity(self, node: ast.FunctionDef) -> int:
+    def _calculate_function_complexity(self, node: Union[ast.FunctionDef, ast.AsyncFunctionDef]) -> int:
         """Calculate cyclomatic complexity of a function."""
         complexity = 1  # Base complexity
         
         for child in ast.walk(node):
-            if isinstance(child, (ast.If, ast.While, ast.For, ast.ExceptHandler)):
+            if isinstance(child, (ast.If, ast.While, ast.For, ast.AsyncFor, ast.ExceptHandler)):
                 complexity += 1
             elif isinstance(child, ast.BoolOp):
                 complexity += len(child.values) - 1
         
         return complexity
     
+    def _max_loop_depth(self, tree: ast.AST) -> int:
+        """Return the deepest nesting of loops and comprehensions in the tree."""
+        depth = 0
+        stack = [(tree, 0)]
+        while stack:
+            node, loops = stack.pop()
+            if isinstance(node, (ast.For, ast.AsyncFor, ast.While, ast.comprehension)):
+                loops += 1
+                depth = max(depth, loops)
+            stack.extend((child, loops) for child in ast.iter_child_nodes(node))
+        return depth
+    
     def _has_break_or_return(self, node: ast.AST) -> bool:
         """Check if a loop has break or return statements."""
         for child in ast.walk(node):
@@ -239,8 +498,8 @@ def main():
         with open(file_path, 'r', encoding='utf-8') as f:
             code = f.read()
         
-        analyzer = PythonAnalyzer()
-        result = analyzer.analyze_code(code, file_path)
+        with PythonAnalyzer() as analyzer:
+            result = analyzer.analyze_code(code, file_path)
         
         # Output as JSON for VS Code extension
         print(json.dumps(asdict(result), indent=2))
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Structured analysis event stream for AI Code Mentor.
+Emits versioned JSON-lines events so consumers (the VS Code sidebar, CI tools)
+can update incrementally while a multi-file analysis is running.
+"""
+
+import json
+import sys
+import time
+from typing import Any, Dict, Iterable, List, Optional, TextIO
+from dataclasses import dataclass, field, asdict
+
+from models.analyzer import AnalysisResult, CodeIssue, PythonAnalyzer
+
+
+EVENT_SCHEMA_VERSION = 1
+
+# Event types, in the order they appear for a single run
+RUN_STARTED = "run_started"
+PROGRESS = "progress"
+ISSUE_ADDED = "issue_added"
+ISSUE_RESOLVED = "issue_resolved"
+FILE_SUMMARY = "file_summary"
+TIMING = "timing"
+RUN_FINISHED = "run_finished"
+
+
+@dataclass
+class AnalysisEvent:
+    """A single event in the analysis stream."""
+    type: str
+    seq: int
+    timestamp: float
+    data: Dict[str, Any] = field(default_factory=dict)
+    v: int = EVENT_SCHEMA_VERSION
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self))
+
+
+def issue_ids(result: AnalysisResult) -> List[str]:
+    """
+    Build identifiers for the result's issues that survive line shifts.
+
+    An id is the issue type, the innermost enclosing function and an occurrence
+    counter, so editing above a finding does not make it look resolved and re-added.
+    """
+    counts: Dict[str, int] = {}
+    ids = []
+    for issue in result.issues:
+        enclosing = [f for f in result.functions if f.line_start <= issue.line <= f.line_end]
+        scope = min(enclosing, key=lambda f: f.line_count).name if enclosing else "<module>"
+        key = f"{result.file_path}:{issue.issue_type}:{scope}"
+        counts[key] = counts.get(key, 0) + 1
+        ids.append(f"{key}:{counts[key]}")
+    return ids
+
+
+class AnalysisEventStream:
+    """
+    Runs the analyzer over files and writes one JSON event per line to a sink.
+
+    The stream remembers the issues it reported per file, so analyzing the same
+    file again emits ``issue_resolved`` for findings that disappeared.
+    """
+
+    def __init__(self, sink: Optional[TextIO] = None, analyzer: Optional[PythonAnalyzer] = None):
+        self.sink = sink if sink is not None else sys.stdout
+        self.analyzer = analyzer or PythonAnalyzer()
+        self.events: List[AnalysisEvent] = []
+        self._seq = 0
+        self._known_issues: Dict[str, Dict[str, CodeIssue]] = {}
+
+    def emit(self, event_type: str, **data: Any) -> AnalysisEvent:
+        """Write an event to the sink and return it."""
+        self._seq += 1
+        event = AnalysisEvent(type=event_type, seq=self._seq, timestamp=time.time(), data=data)
+        self.events.append(event)
+        self.sink.write(event.to_json() + "\n")
+        self.sink.flush()
+        return event
+
+    def analyze_file(self, file_path: str, index: int = 1, total: int = 1,
+                     code: Optional[str] = None) -> Optional[AnalysisResult]:
+        """
+        Analyze one file, emitting progress, issue, summary and timing events.
+
+        If code is given it is analyzed instead of the file on disk (e.g. an
+        unsaved editor buffer), and file_path only names it.
+        """
+        self.emit(PROGRESS, file_path=file_path, index=index, total=total)
+        start = time.perf_counter()
+
+        try:
+            if code is None:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    code = f.read()
+            result = self.analyzer.analyze_code(code, file_path)
+        except Exception as e:
+            # One bad file must not end the stream; report it and move on
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self.emit(FILE_SUMMARY, file_path=file_path, error=str(e), issue_ids=[])
+            self.emit(TIMING, file_path=file_path, elapsed_ms=round(elapsed_ms, 3))
+            return None
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self._emit_issue_changes(file_path, result)
+
+        self.emit(
+            FILE_SUMMARY,
+            file_path=file_path,
+            total_lines=result.total_lines,
+            function_count=len(result.functions),
+            issue_count=len(result.issues),
+            complexity_score=result.complexity_score,
+            suggestions=result.suggestions,
+            analysis_mode=result.analysis_mode,
+            budget_exceeded=result.budget_exceeded,
+            issue_ids=list(self._known_issues[file_path]),
+        )
+        self.emit(TIMING, file_path=file_path, elapsed_ms=round(elapsed_ms, 3))
+        return result
+
+    def run(self, file_paths: Iterable[str], sources: Optional[Dict[str, str]] = None,
+            **options: Any) -> List[AnalysisResult]:
+        """
+        Analyze every file in order, bracketed by run_started/run_finished events.
+
+        sources maps file paths to in-memory source that replaces the file on disk.
+        """
+        sources = sources or {}
+        paths = list(file_paths)
+        self.emit(RUN_STARTED, files=paths, total=len(paths), options=options)
+        # Bring up the analyzer's worker now so its startup is not billed to the first file
+        self.analyzer.start()
+        start = time.perf_counter()
+
+        results = []
+        try:
+            for index, path in enumerate(paths, 1):
+                result = self.analyze_file(path, index, len(paths), sources.get(path))
+                if result is not None:
+                    results.append(result)
+        finally:
+            # Stop the analyzer's worker; it restarts lazily if the stream is reused
+            self.analyzer.close()
+
+            elapsed = time.perf_counter() - start
+            self.emit(
+                RUN_FINISHED,
+                files_analyzed=len(results),
+                files_failed=len(paths) - len(results),
+                issue_count=sum(len(r.issues) for r in results),
+                elapsed_ms=round(elapsed * 1000, 3),
+                files_per_second=round(len(paths) / elapsed, 3) if elapsed > 0 else None,
+            )
+        return results
+
+    def _emit_issue_changes(self, file_path: str, result: AnalysisResult) -> None:
+        """Emit issue_added/issue_resolved by diffing against the last report for the file."""
+        previous = self._known_issues.get(file_path, {})
+        current = dict(zip(issue_ids(result), result.issues))
+
+        for key, issue in current.items():
+            if key not in previous:
+                self.emit(ISSUE_ADDED, file_path=file_path, id=key, issue=asdict(issue))
+
+        for key in previous:
+            if key not in current:
+                self.emit(ISSUE_RESOLVED, file_path=file_path, id=key)
+
+        self._known_issues[file_path] = current
@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Suggestion backends for AI Code Mentor.
+Every backend returns the same suggestion dict (improvedCode, timeComplexity,
+spaceComplexity, explanation, suggestions) and records its own latency metrics.
+"""
+
+import json
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+from dataclasses import dataclass, field
+
+from models.analyzer import AnalysisResult, PythonAnalyzer
+
+
+OPENAI_BASE_URL = "https://api.openai.com/v1"
+DEFAULT_MODEL = "gpt-4"
+
+SYSTEM_PROMPT = "You are an expert Python code reviewer and mentor. Provide clear, actionable feedback with code examples."
+
+UNPARSED_CODE = "Unable to parse improved code from response"
+
+
+def build_prompt(code: str, context: str = "") -> str:
+    """Build the review prompt sent to chat-completion backends."""
+    return f"""
+Please analyze this Python code and provide:
+
+1. **Improved Code**: A cleaner, more efficient version of the code
+2. **Time Complexity**: O() notation and explanation
+3. **Space Complexity**: O() notation and explanation
+4. **What the code is doing**: Clear explanation of the code's purpose and logic
+5. **Suggestions**: 2-3 specific improvements for code quality, readability, or performance
+
+Code to analyze:
+```python
+{code}
+```
+
+{context}
+
+Please format your response as JSON with the following structure:
+{{
+    "improvedCode": "your improved code here",
+    "timeComplexity": "O(n) - explanation",
+    "spaceComplexity": "O(1) - explanation",
+    "explanation": "what the code does",
+    "suggestions": ["suggestion 1", "suggestion 2", "suggestion 3"]
+}}
+"""
+
+
+def parse_response(response: str) -> Dict[str, Any]:
+    """Parse a model response and extract the suggestion JSON."""
+    try:
+        json_match = response.find('{')
+        if json_match != -1:
+            json_str = response[json_match:]
+            parsed = json.loads(json_str)
+            return {
+                "improvedCode": parsed.get("improvedCode", "No improved code provided"),
+                "timeComplexity": parsed.get("timeComplexity", "Not analyzed"),
+                "spaceComplexity": parsed.get("spaceComplexity", "Not analyzed"),
+                "explanation": parsed.get("explanation", "No explanation provided"),
+                "suggestions": parsed.get("suggestions", [])
+            }
+    except Exception as e:
+        print(f"Warning: Failed to parse GPT response: {e}", file=sys.stderr)
+
+    return {
+        "improvedCode": UNPARSED_CODE,
+        "timeComplexity": "Not analyzed",
+        "spaceComplexity": "Not analyzed",
+        "explanation": response,
+        "suggestions": ["Review the response manually for suggestions"]
+    }
+
+
+@dataclass
+class ProviderMetrics:
+    """Latency and outcome counters for one backend."""
+    calls: int = 0
+    failures: int = 0
+    latencies_ms: List[float] = field(default_factory=list)
+
+    def record(self, elapsed_ms: float, ok: bool) -> None:
+        self.calls += 1
+        if not ok:
+            self.failures += 1
+        self.latencies_ms.append(elapsed_ms)
+
+    def summary(self) -> Dict[str, Any]:
+        """Return call counts and mean/p50/p95/max latency in milliseconds."""
+        latencies = sorted(self.latencies_ms)
+        if not latencies:
+            return {"calls": 0, "failures": 0}
+
+        def percentile(p: float) -> float:
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))], 3)
+
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "mean_ms": round(sum(latencies) / len(latencies), 3),
+            "p50_ms": percentile(0.50),
+            "p95_ms": percentile(0.95),
+            "max_ms": round(latencies[-1], 3),
+        }
+
+
+class SuggestionProvider(ABC):
+    """
+    Base class for suggestion backends.
+
+    Subclasses implement _suggest(); suggest() adds the per-backend concurrency
+    limit, latency metrics and error handling.
+    """
+
+    name = "base"
+
+    def __init__(self, max_concurrency: int = 4):
+        if max_concurrency < 1:
+            raise ValueError(f"max_concurrency must be at least 1, got {max_concurrency}")
+        self.max_concurrency = max_concurrency
+        self.metrics = ProviderMetrics()
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._metrics_lock = threading.Lock()
+
+    def suggest(self, code: str, context: str = "",
+                analysis: Optional[AnalysisResult] = None) -> Optional[Dict[str, Any]]:
+        """Return suggestions for the code, or None if the backend failed."""
+        with self._slots:
+            start = time.perf_counter()
+            try:
+                result = self._suggest(code, context, analysis)
+            except Exception as e:
+                print(f"Error getting {self.name} suggestions: {e}", file=sys.stderr)
+                result = None
+            elapsed_ms = (time.perf_counter() - start) * 1000
+
+        with self._metrics_lock:
+            self.metrics.record(elapsed_ms, result is not None)
+        return result
+
+    @abstractmethod
+    def _suggest(self, code: str, context: str,
+                 analysis: Optional[AnalysisResult]) -> Optional[Dict[str, Any]]:
+        """Produce suggestions; return None or raise if the backend cannot."""
+
+
+class OpenAIProvider(SuggestionProvider):
+    """Chat-completions backend for api.openai.com."""
+
+    name = "openai"
+    requires_api_key = True
+
+    def __init__(self, api_key: Optional[str] = None, base_url: str = OPENAI_BASE_URL,
+                 model: str = DEFAULT_MODEL, timeout: float = 60.0, max_concurrency: int = 4):
+        super().__init__(max_concurrency)
+        self.api_key = api_key
+        self.base_url = base_url.rstrip('/')
+        self.model = model
+        self.timeout = timeout
+
+    def _suggest(self, code: str, context: str,
+                 analysis: Optional[AnalysisResult]) -> Optional[Dict[str, Any]]:
+        if self.requires_api_key and not self.api_key:
+            print("Warning: No OpenAI API key provided. Skipping GPT suggestions.", file=sys.stderr)
+            return None
+
+        # Imported lazily so offline backends work without requests installed
+        import requests
+
+        data = {
+            "model": self.model,
+            "messages": [
+                {
+                    "role": "system",
+                    "content": SYSTEM_PROMPT
+                },
+                {
+                    "role": "user",
+                    "content": build_prompt(code, context)
+                }
+            ],
+            "temperature": 0.3,
+            "max_tokens": 2000
+        }
+
+        response = requests.post(
+            f"{self.base_url}/chat/completions",
+            headers=self._headers(),
+            json=data,
+            timeout=self.timeout
+        )
+
+        if response.status_code != 200:
+            print(f"Error calling {self.name} API: {response.status_code}", file=sys.stderr)
+            return None
+
+        content = response.json()['choices'][0]['message']['content']
+        return parse_response(content)
+
+    def _headers(self) -> Dict[str, str]:
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        return headers
+
+
+class LocalProvider(OpenAIProvider):
+    """OpenAI-compatible endpoint (llama.cpp, vLLM, Ollama, ...); the API key is optional."""
+
+    name = "local"
+    requires_api_key = False
+
+    def __init__(self, base_url: str, model: str = DEFAULT_MODEL, api_key: Optional[str] = None,
+                 timeout: float = 60.0, max_concurrency: int = 1):
+        super().__init__(api_key, base_url, model, timeout, max_concurrency)
+
+
+class RuleBasedProvider(SuggestionProvider):
+    """Deterministic offline backend that builds suggestions from analyzer findings."""
+
+    name = "rules"
+
+    def __init__(self, analyzer: Optional[PythonAnalyzer] = None, max_concurrency: int = 16):
+        super().__init__(max_concurrency)
+        self.analyzer = analyzer or PythonAnalyzer()
+        self._analyzer_lock = threading.Lock()
+
+    def _suggest(self, code: str, context: str,
+                 analysis: Optional[AnalysisResult]) -> Optional[Dict[str, Any]]:
+        if analysis is None:
+            # PythonAnalyzer keeps per-call state, so share it one call at a time
+            with self._analyzer_lock:
+                analysis = self.analyzer.analyze_code(code)
+
+        return {
+            "improvedCode": self._annotate(code, analysis),
+            "timeComplexity": self._time_complexity(analysis),
+            "spaceComplexity": "Not analyzed by the rule-based backend",
+            "explanation": self._explain(analysis),
+            "suggestions": self._suggestions(analysis)
+        }
+
+    def _annotate(self, code: str, analysis: AnalysisResult) -> str:
+        """Return the code with a TODO comment above every flagged line."""
+        notes: Dict[int, List[str]] = {}
+        for issue in analysis.issues:
+            if issue.issue_type != 'budget_exceeded':
+                notes.setdefault(issue.line, []).append(issue.suggestion or issue.message)
+
+        lines = code.splitlines()
+        annotated = []
+        for number, line in enumerate(lines, 1):
+            indent = line[:len(line) - len(line.lstrip())]
+            annotated.extend(f"{indent}# TODO: {note}" for note in notes.get(number, []))
+            annotated.append(line)
+        return '\n'.join(annotated)
+
+    def _time_complexity(self, analysis: AnalysisResult) -> str:
+        """Estimate time complexity from the deepest loop nesting the analyzer found."""
+        if analysis.analysis_mode != 'ast' or any(i.issue_type == 'syntax_error' for i in analysis.issues):
+            return "Not analyzed"
+
+        depth = analysis.max_loop_depth
+        if depth == 0:
+            return "O(1) - no loops found"
+        if depth == 1:
+            return "O(n) - deepest loop nesting is 1"
+        return f"O(n^{depth}) - deepest loop nesting is {depth}"
+
+    def _explain(self, analysis: AnalysisResult) -> str:
+        names = ', '.join(f.name for f in analysis.functions) or 'no functions'
+        return (f"{analysis.total_lines} lines defining {names}; "
+                f"{len(analysis.issues)} issue(s) found by static analysis.")
+
+    def _suggestions(self, analysis: AnalysisResult) -> List[str]:
+        suggestions = []
+        for issue in analysis.issues:
+            text = f"Line {issue.line}: {issue.suggestion or issue.message}"
+            if text not in suggestions:
+                suggestions.append(text)
+        suggestions.extend(s for s in analysis.suggestions if s not in suggestions)
+        return suggestions[:3]
+
+
+class RoutingProvider(SuggestionProvider):
+    """Send cheap cases to a local backend and everything else to a remote one."""
+
+    name = "auto"
+
+    def __init__(self, remote: SuggestionProvider, fallback: SuggestionProvider,
+                 max_cheap_lines: int = 40):
+        # Each wrapped backend enforces its own concurrency limit
+        super().__init__(remote.max_concurrency + fallback.max_concurrency)
+        self.remote = remote
+        self.fallback = fallback
+        self.max_cheap_lines = max_cheap_lines
+
+    def _suggest(self, code: str, context: str,
+                 analysis: Optional[AnalysisResult]) -> Optional[Dict[str, Any]]:
+        if analysis is not None and self._is_cheap(analysis):
+            return self.fallback.suggest(code, context, analysis)
+
+        result = self.remote.suggest(code, context, analysis)
+        if result is None:
+            result = self.fallback.suggest(code, context, analysis)
+        return result
+
+    def metrics_by_backend(self) -> Dict[str, Dict[str, Any]]:
+        """Return latency summaries for the router and each wrapped backend."""
+        return {
+            "routed": self.metrics.summary(),
+            "remote": self.remote.metrics.summary(),
+            "fallback": self.fallback.metrics.summary(),
+        }
+
+    def _is_cheap(self, analysis: AnalysisResult) -> bool:
+        """Short files without findings, and files over the analysis budget, stay local."""
+        if analysis.budget_exceeded:
+            return True
+        return analysis.total_lines <= self.max_cheap_lines and not analysis.issues
+
+
+PROVIDERS = {
+    "openai": OpenAIProvider,
+    "local": LocalProvider,
+    "rules": RuleBasedProvider,
+}
+
+
+def create_provider(name: str, api_key: Optional[str] = None, base_url: Optional[str] = None,
+                    model: str = DEFAULT_MODEL, max_concurrency: Optional[int] = None,
+                    analyzer: Optional[PythonAnalyzer] = None) -> SuggestionProvider:
+    """Build a suggestion backend by name: 'openai', 'local', 'rules' or 'auto'."""
+    limit = {} if max_concurrency is None else {"max_concurrency": max_concurrency}
+
+    if name == "openai":
+        return OpenAIProvider(api_key, base_url or OPENAI_BASE_URL, model, **limit)
+    if name == "local":
+        if not base_url:
+            raise ValueError("The 'local' provider requires a base URL")
+        return LocalProvider(base_url, model, api_key, **limit)
+    if name == "rules":
+        return RuleBasedProvider(analyzer, **limit)
+    if name == "auto":
+        remote_name = "local" if base_url else "openai"
+        remote = create_provider(remote_name, api_key, base_url, model, max_concurrency)
+        return RoutingProvider(remote, RuleBasedProvider(analyzer, **limit))
+    raise ValueError(f"Unknown suggestion provider: {name}")
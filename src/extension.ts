@@ -1,5 +1,5 @@
 import * as vscode from 'vscode';
-import { GPTService } from './services/gptService';
+import { createSuggestionProvider } from './services/suggestionProviders';
 import { CodeAnalysisProvider } from './providers/codeAnalysisProvider';
 import { SidebarProvider } from './sidebar';
 
@@ -7,8 +7,8 @@ export function activate(context: vscode.ExtensionContext) {
     console.log('AI Code Mentor extension is now active!');
 
     // Initialize services
-    const gptService = new GPTService();
-    const analysisProvider = new CodeAnalysisProvider(null, gptService);
+    const suggestionProvider = createSuggestionProvider();
+    const analysisProvider = new CodeAnalysisProvider(null, suggestionProvider);
 
     // Register commands
     const analyzeCommand = vscode.commands.registerCommand('ai-code-mentor.analyzeCode', async () => {
@@ -18,16 +18,20 @@ export function activate(context: vscode.ExtensionContext) {
             return;
         }
 
+        const document = editor.document;
+        // Start the sidebar stream first so insights do not wait on suggestions
+        const sidebarUpdate = updateSidebar(analysisProvider, document);
+
         try {
-            const document = editor.document;
-            const code = document.getText();
-            const analysis = await analysisProvider.analyzeCode(code, document.fileName);
+            const analysis = await analysisProvider.analyzeCode(document.getText(), document.fileName);
             
             // Show analysis results in a new panel
             await showAnalysisResults(analysis);
         } catch (error) {
             vscode.window.showErrorMessage(`Analysis failed: ${error}`);
         }
+
+        await sidebarUpdate;
     });
 
     const suggestionsCommand = vscode.commands.registerCommand('ai-code-mentor.getSuggestions', async () => {
@@ -43,6 +47,7 @@ export function activate(context: vscode.ExtensionContext) {
             const code = document.getText(selection) || document.getText();
             
             const suggestions = await analysisProvider.getSuggestions(code, document.fileName);
+            console.log('Suggestion latency:', suggestionProvider.getMetrics());
             await showSuggestions(suggestions);
         } catch (error) {
             vscode.window.showErrorMessage(`Failed to get suggestions: ${error}`);
@@ -59,6 +64,8 @@ export function activate(context: vscode.ExtensionContext) {
         if (event.document.languageId === 'python') {
             // Debounce rapid changes
             setTimeout(async () => {
+                const sidebarUpdate = updateSidebar(analysisProvider, event.document);
+
                 try {
                     const analysis = await analysisProvider.analyzeCode(
                         event.document.getText(), 
@@ -70,11 +77,38 @@ export function activate(context: vscode.ExtensionContext) {
                 } catch (error) {
                     console.error('Real-time analysis failed:', error);
                 }
+
+                await sidebarUpdate;
             }, 1000);
         }
     });
 
-    context.subscriptions.push(analyzeCommand, suggestionsCommand, sidebarCommand, documentChangeListener);
+    // Pick up provider and concurrency changes without a reload
+    const configurationListener = vscode.workspace.onDidChangeConfiguration(async (event) => {
+        if (event.affectsConfiguration('aiCodeMentor')) {
+            await analysisProvider.refreshConfiguration();
+        }
+    });
+
+    context.subscriptions.push(analyzeCommand, suggestionsCommand, sidebarCommand, documentChangeListener, configurationListener);
+}
+
+// Feed the insights sidebar from the event stream if it is open, sending the
+// editor buffer so unsaved and untitled documents are covered
+async function updateSidebar(analysisProvider: CodeAnalysisProvider, document: vscode.TextDocument) {
+    const sidebar = SidebarProvider.currentPanel;
+    if (!sidebar) {
+        return;
+    }
+    try {
+        await analysisProvider.streamAnalysisEvents(
+            [document.fileName],
+            (event) => sidebar.postEvent(event),
+            document.getText()
+        );
+    } catch (error) {
+        console.error('Sidebar update failed:', error);
+    }
 }
 
 async function showAnalysisResults(analysis: any) {
@@ -1,6 +1,7 @@
 import * as vscode from 'vscode';
 import { spawn } from 'child_process';
-import { GPTService, GPTSuggestion } from '../services/gptService';
+import { GPTSuggestion } from '../services/gptService';
+import { SuggestionProvider } from '../services/suggestionProviders';
 
 export interface AnalysisResult {
     filePath: string;
@@ -11,10 +12,18 @@ export interface AnalysisResult {
     suggestions: string[];
 }
 
+export interface AnalysisEvent {
+    v: number;
+    type: 'run_started' | 'progress' | 'issue_added' | 'issue_resolved' | 'file_summary' | 'timing' | 'run_finished';
+    seq: number;
+    timestamp: number;
+    data: any;
+}
+
 export class CodeAnalysisProvider {
     constructor(
         private analyzer: any, // PythonAnalyzer instance
-        private gptService: GPTService
+        private suggestionProvider: SuggestionProvider
     ) {}
 
     async analyzeCode(code: string, filePath: string): Promise<AnalysisResult> {
@@ -22,8 +31,8 @@ export class CodeAnalysisProvider {
             // Run Python AST analysis
             const astAnalysis = await this.runPythonAnalyzer(code, filePath);
             
-            // Get GPT suggestions for the entire code
-            const gptSuggestions = await this.gptService.getSuggestions(code, `Analyzing file: ${filePath}`);
+            // Get suggestions for the entire code
+            const gptSuggestions = await this.suggestionProvider.getSuggestions(code, `Analyzing file: ${filePath}`, astAnalysis);
             
             // Combine results
             return {
@@ -42,8 +51,8 @@ export class CodeAnalysisProvider {
             const astAnalysis = await this.runPythonAnalyzer(code, filePath);
             const context = this.buildContextString(astAnalysis);
             
-            // Get GPT suggestions with context
-            return await this.gptService.getSuggestions(code, context);
+            // Get suggestions with context
+            return await this.suggestionProvider.getSuggestions(code, context, astAnalysis);
         } catch (error) {
             console.error('Failed to get suggestions:', error);
             throw error;
@@ -86,6 +95,48 @@ export class CodeAnalysisProvider {
         });
     }
 
+    async streamAnalysisEvents(filePaths: string[], onEvent: (event: AnalysisEvent) => void, code?: string): Promise<void> {
+        return new Promise((resolve, reject) => {
+            // With code, the single file path only names the buffer sent over stdin
+            const args = ['cli.py', '--events', ...(code !== undefined ? ['--stdin'] : []), ...filePaths];
+            const pythonProcess = spawn('python', args, {
+                stdio: ['pipe', 'pipe', 'pipe']
+            });
+
+            let buffered = '';
+            let errorOutput = '';
+
+            // Events are JSON lines; forward each complete line as soon as it arrives
+            pythonProcess.stdout.on('data', (data) => {
+                buffered += data.toString();
+                const lines = buffered.split('\n');
+                buffered = lines.pop() || '';
+                for (const line of lines) {
+                    if (line.trim()) {
+                        onEvent(JSON.parse(line));
+                    }
+                }
+            });
+
+            pythonProcess.stderr.on('data', (data) => {
+                errorOutput += data.toString();
+            });
+
+            pythonProcess.on('close', (code) => {
+                if (code === 0) {
+                    resolve();
+                } else {
+                    reject(new Error(`Python analyzer failed: ${errorOutput}`));
+                }
+            });
+
+            if (code !== undefined) {
+                pythonProcess.stdin.write(code);
+            }
+            pythonProcess.stdin.end();
+        });
+    }
+
     private buildContextString(analysis: AnalysisResult): string {
         const context = [];
         
@@ -105,6 +156,6 @@ export class CodeAnalysisProvider {
     }
 
     async refreshConfiguration(): Promise<void> {
-        await this.gptService.refreshConfiguration();
+        await this.suggestionProvider.refreshConfiguration();
     }
 } 
\ No newline at end of file
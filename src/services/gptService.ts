@@ -12,15 +12,36 @@ export interface GPTSuggestion {
 export class GPTService {
     private openai: OpenAI | null = null;
     private apiKey: string | undefined;
+    private model = 'gpt-4';
+    private configError: string | undefined;
 
-    constructor() {
+    // backend is 'openai' or 'local'; defaults to the configured suggestion provider
+    constructor(private backend?: string) {
         this.initializeOpenAI();
     }
 
     private initializeOpenAI(): void {
-        this.apiKey = vscode.workspace.getConfiguration('aiCodeMentor').get('openaiApiKey');
-        
-        if (this.apiKey) {
+        const config = vscode.workspace.getConfiguration('aiCodeMentor');
+        const provider = this.backend || config.get<string>('suggestionProvider') || 'openai';
+        const localEndpoint = config.get<string>('localEndpoint');
+        this.apiKey = config.get('openaiApiKey');
+        this.model = config.get<string>('model') || 'gpt-4';
+        this.openai = null;
+        this.configError = undefined;
+
+        if (provider === 'local') {
+            // Never fall back to api.openai.com: the user chose to keep code on their own endpoint
+            if (!localEndpoint) {
+                this.configError = "The 'local' suggestion provider requires aiCodeMentor.localEndpoint to be set.";
+                vscode.window.showErrorMessage(this.configError);
+                return;
+            }
+            // OpenAI-compatible local servers usually ignore the key, but the SDK requires one
+            this.openai = new OpenAI({
+                apiKey: this.apiKey || 'local',
+                baseURL: localEndpoint,
+            });
+        } else if (this.apiKey) {
             this.openai = new OpenAI({
                 apiKey: this.apiKey,
             });
@@ -29,14 +50,14 @@ export class GPTService {
 
     async getSuggestions(code: string, context?: string): Promise<GPTSuggestion> {
         if (!this.openai) {
-            throw new Error('OpenAI API key not configured. Please set aiCodeMentor.openaiApiKey in settings.');
+            throw new Error(this.configError || 'OpenAI API key not configured. Please set aiCodeMentor.openaiApiKey in settings.');
         }
 
         const prompt = this.buildPrompt(code, context);
 
         try {
             const completion = await this.openai.chat.completions.create({
-                model: 'gpt-4',
+                model: this.model,
                 messages: [
                     {
                         role: 'system',
@@ -53,7 +74,7 @@ export class GPTService {
 
             const response = completion.choices[0]?.message?.content;
             if (!response) {
-                throw new Error('No response from GPT-4');
+                throw new Error(`No response from ${this.model}`);
             }
 
             return this.parseGPTResponse(response);
@@ -0,0 +1,226 @@
+import * as vscode from 'vscode';
+import { spawn } from 'child_process';
+import { GPTService, GPTSuggestion } from './gptService';
+import { AnalysisResult } from '../providers/codeAnalysisProvider';
+
+export interface SuggestionProvider {
+    getSuggestions(code: string, context?: string, analysis?: AnalysisResult): Promise<GPTSuggestion>;
+    refreshConfiguration(): Promise<void>;
+}
+
+export interface LatencyMetrics {
+    calls: number;
+    failures: number;
+    meanMs: number;
+    maxMs: number;
+}
+
+export class RuleBasedSuggestionService implements SuggestionProvider {
+    // Delegates to the Python rule-based backend so there is a single implementation
+    async getSuggestions(code: string, context?: string, analysis?: AnalysisResult): Promise<GPTSuggestion> {
+        const fileName = (analysis as any)?.file_path || 'untitled.py';
+
+        return new Promise((resolve, reject) => {
+            const pythonProcess = spawn('python', ['cli.py', fileName, '--stdin', '--gpt', '--provider', 'rules', '--json'], {
+                stdio: ['pipe', 'pipe', 'pipe']
+            });
+
+            let output = '';
+            let errorOutput = '';
+
+            pythonProcess.stdout.on('data', (data) => {
+                output += data.toString();
+            });
+
+            pythonProcess.stderr.on('data', (data) => {
+                errorOutput += data.toString();
+            });
+
+            pythonProcess.on('close', (exitCode) => {
+                if (exitCode !== 0) {
+                    reject(new Error(`Rule-based provider failed: ${errorOutput}`));
+                    return;
+                }
+                try {
+                    const suggestions = JSON.parse(output).gptSuggestions;
+                    if (!suggestions) {
+                        throw new Error(errorOutput || 'no suggestions returned');
+                    }
+                    resolve(suggestions);
+                } catch (error) {
+                    reject(new Error(`Failed to parse rule-based suggestions: ${error}`));
+                }
+            });
+
+            pythonProcess.stdin.write(code);
+            pythonProcess.stdin.end();
+        });
+    }
+
+    async refreshConfiguration(): Promise<void> {}
+}
+
+export class LatencyRecorder {
+    private latencies: number[] = [];
+    private failures = 0;
+
+    async time<T>(call: () => Promise<T>): Promise<T> {
+        const start = Date.now();
+        try {
+            return await call();
+        } catch (error) {
+            this.failures++;
+            throw error;
+        } finally {
+            this.latencies.push(Date.now() - start);
+        }
+    }
+
+    summary(): LatencyMetrics {
+        const total = this.latencies.reduce((sum, ms) => sum + ms, 0);
+        return {
+            calls: this.latencies.length,
+            failures: this.failures,
+            meanMs: this.latencies.length ? total / this.latencies.length : 0,
+            maxMs: Math.max(0, ...this.latencies)
+        };
+    }
+}
+
+export class LimitedSuggestionProvider implements SuggestionProvider {
+    private active = 0;
+    private waiting: (() => void)[] = [];
+
+    constructor(private inner: SuggestionProvider, private maxConcurrency: number, private metrics: LatencyRecorder) {}
+
+    async getSuggestions(code: string, context?: string, analysis?: AnalysisResult): Promise<GPTSuggestion> {
+        await this.acquire();
+        try {
+            return await this.metrics.time(() => this.inner.getSuggestions(code, context, analysis));
+        } finally {
+            this.release();
+        }
+    }
+
+    async refreshConfiguration(): Promise<void> {
+        await this.inner.refreshConfiguration();
+    }
+
+    private acquire(): Promise<void> {
+        if (this.active < this.maxConcurrency) {
+            this.active++;
+            return Promise.resolve();
+        }
+        // The slot is handed over directly by release(), so active stays unchanged
+        return new Promise(resolve => this.waiting.push(resolve));
+    }
+
+    private release(): void {
+        const next = this.waiting.shift();
+        if (next) {
+            next();
+        } else {
+            this.active--;
+        }
+    }
+}
+
+export class RoutingSuggestionProvider implements SuggestionProvider {
+    // Mirrors the CLI's 'auto' provider: cheap cases stay on the rule-based backend
+    constructor(
+        private remote: SuggestionProvider,
+        private fallback: SuggestionProvider,
+        private metrics: LatencyRecorder,
+        private maxCheapLines = 40
+    ) {}
+
+    async getSuggestions(code: string, context?: string, analysis?: AnalysisResult): Promise<GPTSuggestion> {
+        return this.metrics.time(async () => {
+            if (analysis && this.isCheap(analysis)) {
+                return this.fallback.getSuggestions(code, context, analysis);
+            }
+            try {
+                return await this.remote.getSuggestions(code, context, analysis);
+            } catch (error) {
+                console.error('Remote suggestions failed, using rules:', error);
+                return this.fallback.getSuggestions(code, context, analysis);
+            }
+        });
+    }
+
+    async refreshConfiguration(): Promise<void> {
+        await this.remote.refreshConfiguration();
+        await this.fallback.refreshConfiguration();
+    }
+
+    private isCheap(analysis: AnalysisResult): boolean {
+        // The analyzer's JSON uses the Python field names
+        const result = analysis as any;
+        if (result.budget_exceeded) {
+            return true;
+        }
+        return result.total_lines <= this.maxCheapLines && !(result.issues || []).length;
+    }
+}
+
+export class ConfiguredSuggestionProvider implements SuggestionProvider {
+    // Kept across refreshes so latency history survives a settings change
+    private metrics = new Map<string, LatencyRecorder>();
+    private backend: SuggestionProvider;
+
+    constructor() {
+        this.backend = this.build();
+    }
+
+    getSuggestions(code: string, context?: string, analysis?: AnalysisResult): Promise<GPTSuggestion> {
+        return this.backend.getSuggestions(code, context, analysis);
+    }
+
+    getMetrics(): Record<string, LatencyMetrics> {
+        const summaries: Record<string, LatencyMetrics> = {};
+        for (const [name, recorder] of this.metrics) {
+            summaries[name] = recorder.summary();
+        }
+        return summaries;
+    }
+
+    async refreshConfiguration(): Promise<void> {
+        // Rebuild so a changed provider or maxConcurrentRequests takes effect
+        this.backend = this.build();
+    }
+
+    private build(): SuggestionProvider {
+        const config = vscode.workspace.getConfiguration('aiCodeMentor');
+        const provider = config.get<string>('suggestionProvider') || 'openai';
+        const maxConcurrency = Math.max(1, Math.floor(config.get<number>('maxConcurrentRequests') || 2));
+
+        if (provider === 'auto') {
+            const remoteName = config.get<string>('localEndpoint') ? 'local' : 'openai';
+            return new RoutingSuggestionProvider(
+                this.limited(remoteName, new GPTService(remoteName), maxConcurrency),
+                this.limited('rules', new RuleBasedSuggestionService(), maxConcurrency),
+                this.recorder('auto')
+            );
+        }
+        // 'openai' and 'local' are both served by the OpenAI client, pointed at different base URLs
+        const inner = provider === 'rules' ? new RuleBasedSuggestionService() : new GPTService(provider);
+        return this.limited(provider, inner, maxConcurrency);
+    }
+
+    private limited(name: string, inner: SuggestionProvider, maxConcurrency: number): LimitedSuggestionProvider {
+        return new LimitedSuggestionProvider(inner, maxConcurrency, this.recorder(name));
+    }
+
+    private recorder(name: string): LatencyRecorder {
+        let recorder = this.metrics.get(name);
+        if (!recorder) {
+            recorder = new LatencyRecorder();
+            this.metrics.set(name, recorder);
+        }
+        return recorder;
+    }
+}
+
+export function createSuggestionProvider(): ConfiguredSuggestionProvider {
+    return new ConfiguredSuggestionProvider();
+}
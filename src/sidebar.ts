@@ -1,6 +1,7 @@
 import * as vscode from 'vscode';
 import * as path from 'path';
 import * as fs from 'fs';
+import { AnalysisEvent } from './providers/codeAnalysisProvider';
 
 export class SidebarProvider {
     public static currentPanel: SidebarProvider | undefined;
@@ -26,6 +27,7 @@ export class SidebarProvider {
             column || vscode.ViewColumn.One,
             {
                 enableScripts: true,
+                retainContextWhenHidden: true,
                 localResourceRoots: [extensionUri]
             }
         );
@@ -44,16 +46,11 @@ export class SidebarProvider {
         // This happens when the user closes the panel or when the panel is closed programmatically
         this._panel.onDidDispose(() => this.dispose(), null, this._disposables);
 
-        // Update the content based on view changes
-        this._panel.onDidChangeViewState(
-            (e: vscode.WebviewPanelOnDidChangeViewStateEvent) => {
-                if (this._panel.visible) {
-                    this._update();
-                }
-            },
-            null,
-            this._disposables
-        );
+    }
+
+    public postEvent(event: AnalysisEvent) {
+        // The webview applies events incrementally instead of re-rendering the whole list
+        this._panel.webview.postMessage(event);
     }
 
     public async _update() {
@@ -58,6 +58,7 @@ declare module 'vscode' {
 
     export interface Webview {
         html: string;
+        postMessage(message: any): Thenable<boolean>;
     }
 
     export enum ViewColumn {
@@ -72,8 +73,13 @@ declare module 'vscode' {
         export function showErrorMessage(message: string): Thenable<string | undefined>;
     }
 
+    export interface WorkspaceConfiguration {
+        get<T>(section: string): T | undefined;
+    }
+
     export namespace workspace {
         export function onDidChangeTextDocument(listener: (e: TextDocumentChangeEvent) => any): Disposable;
+        export function getConfiguration(section?: string): WorkspaceConfiguration;
     }
 
     export namespace commands {
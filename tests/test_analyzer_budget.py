@@ -0,0 +1,157 @@
+import ast
+import multiprocessing
+import sys
+import os
+
+# Add the parent directory to the path so we can import models
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.analyzer import AnalysisBudget, PythonAnalyzer
+
+LONG_FUNCTION = "def long_one():\n" + "    x = 1\n" * 40 + "\ndef short_one():\n    return 2\n"
+
+
+def _analyze(code, **budget):
+    analyzer = PythonAnalyzer(budget=AnalysisBudget(**budget))
+    try:
+        return analyzer.analyze_code(code, "test.py")
+    finally:
+        analyzer.close()
+
+
+def test_within_budget_uses_ast():
+    """Test that ordinary files get full AST analysis and report no tripped budget"""
+    result = _analyze(LONG_FUNCTION)
+
+    assert result.analysis_mode == "ast"
+    assert result.budget_exceeded is None
+    assert [f.name for f in result.functions] == ["long_one", "short_one"]
+
+
+def test_max_bytes_falls_back_to_token_scan():
+    """Test that oversized files are scanned by tokens and still flag long functions"""
+    result = _analyze(LONG_FUNCTION, max_bytes=100)
+
+    assert result.analysis_mode == "tokens"
+    assert result.budget_exceeded == "max_bytes"
+    assert [(f.name, f.line_start, f.line_end) for f in result.functions] == [
+        ("long_one", 1, 41), ("short_one", 43, 44)
+    ]
+    assert "long_function" in [i.issue_type for i in result.issues]
+
+
+def test_deep_nesting_trips_depth_budget():
+    """Test that deeply nested expressions cannot blow the recursion limit"""
+    for depth in (500, 20000):
+        result = _analyze("x" + " + x" * depth)
+
+        assert result.analysis_mode == "tokens"
+        assert result.budget_exceeded == "max_ast_depth"
+
+
+def test_huge_literal_trips_node_budget():
+    """Test that large literal tables are caught by the node budget"""
+    code = "table = [" + ", ".join(str(i) for i in range(5000)) + "]\n"
+    result = _analyze(code, max_nodes=1000)
+
+    assert result.budget_exceeded == "max_nodes"
+
+
+def test_time_limit_is_enforced_in_worker():
+    """Test that a file over the wall-time limit is abandoned and degrades"""
+    code = "".join(f"def f{i}(x):\n    for y in x:\n        if y:\n            return y\n" for i in range(3000))
+    result = _analyze(code, time_limit=0.001)
+
+    assert result.budget_exceeded == "time_limit"
+    assert len(result.functions) == 3000
+
+
+def _analyze_in_pool(code):
+    return PythonAnalyzer().analyze_code(code, "pooled.py")
+
+
+def test_analyzer_runs_inside_pool_workers():
+    """Test that daemonic Pool workers analyze in-process instead of spawning a worker"""
+    codes = [LONG_FUNCTION, "x = 1\n", "def f(:\n"]
+    with multiprocessing.Pool(2) as pool:
+        results = pool.map(_analyze_in_pool, codes)
+
+    assert [r.analysis_mode for r in results] == ["ast", "ast", "ast"]
+    assert results[0].functions[0].name == "long_one"
+    assert results[2].issues[0].issue_type == "syntax_error"
+
+
+def test_parser_memory_error_has_its_own_reason(monkeypatch):
+    """Test that running out of memory in the parser is not reported as a depth budget"""
+    def out_of_memory(code):
+        raise MemoryError
+
+    monkeypatch.setattr(ast, "parse", out_of_memory)
+    result = _analyze("x = 1\n", time_limit=None)
+
+    assert result.budget_exceeded == "parser_out_of_memory"
+
+
+def test_token_scan_matches_ast_counts():
+    """Test that comprehensions and conditional expressions count the same in both modes"""
+    code = (
+        "def g(items):\n"
+        "    evens = [i for i in items if i % 2 == 0]\n"
+        "    return evens if evens else None\n"
+        "\n"
+        "def h(items):\n"
+        "    for i in items:\n"
+        "        if i and i > 2:\n"
+        "            return i\n"
+        "        elif i:\n"
+        "            continue\n"
+        "    while items:\n"
+        "        items.pop()\n"
+    )
+    full = _analyze(code)
+    scanned = _analyze(code, max_bytes=10)
+
+    def counts(result):
+        return [(f.name, f.complexity, f.nested_loops) for f in result.functions]
+
+    assert scanned.analysis_mode == "tokens"
+    assert counts(scanned) == counts(full)
+
+
+def test_worker_startup_is_not_billed_to_the_time_limit():
+    """Test that the first file gets its full time limit and the context manager stops the worker"""
+    with PythonAnalyzer(budget=AnalysisBudget(time_limit=0.05)) as analyzer:
+        result = analyzer.analyze_code("x = 1\n", "first.py")
+
+    assert result.budget_exceeded is None
+    assert analyzer._worker is None
+
+
+def test_async_functions_count_the_same_in_both_modes():
+    """Test that async defs and async for loops are analyzed in the AST path and the token scan"""
+    code = (
+        "async def fetch_all(sources):\n"
+        "    async for chunk in sources:\n"
+        "        if chunk:\n"
+        "            for part in chunk:\n"
+        "                yield part\n"
+    )
+    full = _analyze(code)
+    scanned = _analyze(code, max_bytes=10)
+
+    def counts(result):
+        return [(f.name, f.complexity, f.nested_loops) for f in result.functions]
+
+    assert counts(full) == [("fetch_all", 4, 2)]
+    assert counts(scanned) == counts(full)
+
+
+def test_worker_can_be_started_ahead_of_the_first_file():
+    """Test that start() brings the worker up once and analysis reuses it"""
+    with PythonAnalyzer() as analyzer:
+        analyzer.start()
+        worker = analyzer._worker
+        assert worker._process.is_alive()
+
+        analyzer.analyze_code("x = 1\n", "first.py")
+        assert analyzer._worker is worker
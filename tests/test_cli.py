@@ -23,6 +23,15 @@ def test_cli_defaults():
     assert args.verbose is False
     assert args.color == "auto"
 
+def test_max_concurrency_must_be_positive():
+    """Test that --max-concurrency rejects zero and negative limits"""
+    parser = build_parser()
+    assert parser.parse_args(["test_file.py", "--max-concurrency", "3"]).max_concurrency == 3
+    
+    for value in ("0", "-2"):
+        with pytest.raises(SystemExit):
+            parser.parse_args(["test_file.py", "--max-concurrency", value])
+
 def test_colorize_function():
     """Test the colorize function"""
     from cli import colorize
@@ -0,0 +1,160 @@
+import io
+import json
+import sys
+import os
+
+# Add the parent directory to the path so we can import models
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.analyzer import PythonAnalyzer
+from models.events import AnalysisEventStream, EVENT_SCHEMA_VERSION
+
+LOOPY_CODE = """
+def spin():
+    while True:
+        pass
+"""
+
+CLEAN_CODE = """
+def add(a, b):
+    return a + b
+"""
+
+
+def _write_files(tmp_path, count):
+    paths = []
+    for i in range(count):
+        path = tmp_path / f"module_{i}.py"
+        path.write_text(LOOPY_CODE if i % 2 else CLEAN_CODE, encoding="utf-8")
+        paths.append(str(path))
+    return paths
+
+
+def _read_events(sink):
+    return [json.loads(line) for line in sink.getvalue().splitlines()]
+
+
+def test_multi_file_event_ordering(tmp_path):
+    """Test that a multi-file run emits well-ordered, versioned JSON-lines events"""
+    paths = _write_files(tmp_path, 4)
+    sink = io.StringIO()
+
+    AnalysisEventStream(sink).run(paths)
+    events = _read_events(sink)
+
+    assert all(e["v"] == EVENT_SCHEMA_VERSION for e in events)
+    assert [e["seq"] for e in events] == list(range(1, len(events) + 1))
+    assert events[0]["type"] == "run_started"
+    assert events[0]["data"]["files"] == paths
+    assert events[-1]["type"] == "run_finished"
+
+    # Each file is bracketed by progress ... timing, in input order
+    per_file = events[1:-1]
+    for index, path in enumerate(paths, 1):
+        file_events = [e for e in per_file if e["data"]["file_path"] == path]
+        types = [e["type"] for e in file_events]
+        assert types[0] == "progress"
+        assert file_events[0]["data"]["index"] == index
+        assert types[-2:] == ["file_summary", "timing"]
+        added = [e for e in file_events if e["type"] == "issue_added"]
+        assert len(added) == file_events[-2]["data"]["issue_count"]
+        assert [e["data"]["id"] for e in added] == file_events[-2]["data"]["issue_ids"]
+
+    progress_order = [e["data"]["file_path"] for e in events if e["type"] == "progress"]
+    assert progress_order == paths
+
+
+def test_reanalysis_emits_resolved_issues(tmp_path):
+    """Test that fixing a file emits issue_resolved for the findings that disappeared"""
+    path = tmp_path / "spin.py"
+    path.write_text(LOOPY_CODE, encoding="utf-8")
+    sink = io.StringIO()
+    stream = AnalysisEventStream(sink)
+
+    stream.analyze_file(str(path))
+    added = [e for e in _read_events(sink) if e["type"] == "issue_added"]
+    assert len(added) == 1
+
+    path.write_text(CLEAN_CODE, encoding="utf-8")
+    stream.analyze_file(str(path))
+    resolved = [e for e in _read_events(sink) if e["type"] == "issue_resolved"]
+    assert [e["data"]["id"] for e in resolved] == [added[0]["data"]["id"]]
+
+
+def test_event_stream_throughput(tmp_path):
+    """Test that a larger run reports throughput consistent with its timing events"""
+    paths = _write_files(tmp_path, 200)
+    sink = io.StringIO()
+
+    AnalysisEventStream(sink).run(paths)
+    events = _read_events(sink)
+
+    finished = events[-1]["data"]
+    timings = [e["data"]["elapsed_ms"] for e in events if e["type"] == "timing"]
+    assert finished["files_analyzed"] == len(paths)
+    assert finished["files_failed"] == 0
+    assert len(timings) == len(paths)
+    # Per-file time is a share of the run, and files_per_second follows from the run time
+    assert sum(timings) <= finished["elapsed_ms"]
+    expected_rate = len(paths) / (finished["elapsed_ms"] / 1000)
+    assert abs(finished["files_per_second"] - expected_rate) <= 0.01 * expected_rate
+
+
+def test_in_memory_source_replaces_file(tmp_path):
+    """Test that an unsaved buffer is analyzed instead of the stale file on disk"""
+    path = str(tmp_path / "untitled.py")
+    sink = io.StringIO()
+
+    AnalysisEventStream(sink).run([path], sources={path: LOOPY_CODE})
+    events = _read_events(sink)
+
+    assert [e["type"] for e in events].count("issue_added") == 1
+    assert events[-1]["data"]["files_failed"] == 0
+
+
+def test_issue_ids_survive_line_shifts(tmp_path):
+    """Test that inserting lines above a finding keeps its id instead of re-adding it"""
+    path = str(tmp_path / "spin.py")
+    sink = io.StringIO()
+    stream = AnalysisEventStream(sink)
+
+    stream.analyze_file(path, code=LOOPY_CODE)
+    stream.analyze_file(path, code="import os\nimport sys\n" + LOOPY_CODE)
+    events = _read_events(sink)
+
+    assert [e["type"] for e in events].count("issue_added") == 1
+    assert "issue_resolved" not in [e["type"] for e in events]
+    assert events[-2]["data"]["issue_ids"] == [f"{path}:potential_infinite_loop:spin:1"]
+
+
+def test_failing_file_still_reports_summary_and_timing(tmp_path):
+    """Test that an undecodable buffer becomes a file error and the run still finishes"""
+    bad = str(tmp_path / "buf.py")
+    good = str(tmp_path / "good.py")
+    sink = io.StringIO()
+
+    # Surrogate-escaped bytes, as produced by reading invalid UTF-8 from stdin
+    AnalysisEventStream(sink).run([bad, good], sources={bad: 'x = "\udcff"\n', good: CLEAN_CODE})
+    events = _read_events(sink)
+
+    bad_events = [e["type"] for e in events if e["data"].get("file_path") == bad]
+    assert bad_events == ["progress", "file_summary", "timing"]
+    assert events[-1]["type"] == "run_finished"
+    assert events[-1]["data"]["files_analyzed"] == 1
+    assert events[-1]["data"]["files_failed"] == 1
+
+
+def test_run_starts_worker_before_timing_files(tmp_path):
+    """Test that worker startup happens before the run clock, not inside the first file"""
+    started = []
+
+    class RecordingAnalyzer(PythonAnalyzer):
+        def start(self):
+            started.append(len(sink.getvalue().splitlines()))
+            super().start()
+
+    sink = io.StringIO()
+    AnalysisEventStream(sink, RecordingAnalyzer()).run(_write_files(tmp_path, 2))
+
+    # First started right after run_started, before the first progress event
+    assert started[0] == 1
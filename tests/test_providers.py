@@ -0,0 +1,182 @@
+import ast
+import json
+import sys
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+# Add the parent directory to the path so we can import models
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.analyzer import PythonAnalyzer
+from models.providers import (
+    RoutingProvider, RuleBasedProvider, SuggestionProvider, create_provider
+)
+
+NESTED_CODE = """
+def pairs(items):
+    result = []
+    for a in items:
+        for b in items:
+            result.append((a, b))
+    return result
+"""
+
+
+class SlowProvider(SuggestionProvider):
+    """Test backend that records how many calls overlap."""
+
+    name = "slow"
+
+    def __init__(self, max_concurrency):
+        super().__init__(max_concurrency)
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def _suggest(self, code, context, analysis):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.02)
+        with self.lock:
+            self.active -= 1
+        return {"suggestions": []}
+
+
+def test_rule_based_provider_is_deterministic():
+    """Test that the rule-based backend builds suggestions from analyzer findings"""
+    provider = RuleBasedProvider()
+    analysis = PythonAnalyzer(max_nested_loops=1).analyze_code(NESTED_CODE)
+
+    first = provider.suggest(NESTED_CODE, analysis=analysis)
+    second = provider.suggest(NESTED_CODE, analysis=analysis)
+
+    assert first == second
+    assert first["timeComplexity"].startswith("O(n^2)")
+    assert "# TODO: Consider refactoring to reduce nesting" in first["improvedCode"]
+    assert first["suggestions"][0] == "Line 2: Consider refactoring to reduce nesting"
+    provider.analyzer.close()
+
+
+def test_time_complexity_comes_from_the_analyzer_pass(monkeypatch):
+    """Test that the rule-based backend reads loop depth from the analysis instead of re-parsing"""
+    provider = RuleBasedProvider()
+    analysis = PythonAnalyzer().analyze_code(NESTED_CODE)
+    assert analysis.max_loop_depth == 2
+
+    def no_parse(code):
+        raise AssertionError("source parsed again")
+
+    monkeypatch.setattr(ast, "parse", no_parse)
+    assert provider.suggest(NESTED_CODE, analysis=analysis)["timeComplexity"].startswith("O(n^2)")
+    provider.analyzer.close()
+
+
+def test_concurrency_limit_and_latency_metrics():
+    """Test that a backend never exceeds its concurrency limit and records latency"""
+    provider = SlowProvider(max_concurrency=2)
+    threads = [threading.Thread(target=provider.suggest, args=("x = 1",)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    summary = provider.metrics.summary()
+    assert provider.peak == 2
+    assert summary["calls"] == 8
+    assert summary["failures"] == 0
+    assert summary["p50_ms"] >= 15
+
+
+def test_routing_keeps_cheap_cases_local():
+    """Test that short clean files skip the remote backend"""
+    remote = SlowProvider(max_concurrency=1)
+    routing = RoutingProvider(remote, RuleBasedProvider())
+    analyzer = PythonAnalyzer()
+
+    routing.suggest("x = 1\n", analysis=analyzer.analyze_code("x = 1\n"))
+    assert remote.metrics.calls == 0
+
+    long_code = "\n".join(f"x{i} = {i}" for i in range(100))
+    routing.suggest(long_code, analysis=analyzer.analyze_code(long_code))
+    assert remote.metrics.calls == 1
+    analyzer.close()
+    routing.fallback.analyzer.close()
+
+
+def test_unknown_or_incomplete_provider_config():
+    """Test that provider configuration errors are reported"""
+    with pytest.raises(ValueError):
+        create_provider("local")
+    with pytest.raises(ValueError):
+        create_provider("nope")
+
+
+def test_local_provider_calls_compatible_endpoint():
+    """Test that the local backend talks to an OpenAI-compatible URL without an API key"""
+    pytest.importorskip("requests")
+    requests_seen = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            requests_seen.append((self.path, body["model"]))
+            content = json.dumps({"explanation": "local", "suggestions": ["ok"]})
+            payload = json.dumps({"choices": [{"message": {"content": content}}]}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        provider = create_provider("local", base_url=f"http://127.0.0.1:{server.server_port}/v1",
+                                   model="tiny-coder")
+        result = provider.suggest("x = 1")
+    finally:
+        server.shutdown()
+
+    assert requests_seen == [("/v1/chat/completions", "tiny-coder")]
+    assert result["explanation"] == "local"
+    assert provider.metrics.summary()["calls"] == 1
+
+
+def test_routing_reports_metrics_per_backend():
+    """Test that remote failures and fallback calls show up in their own metrics"""
+    provider = create_provider("auto", max_concurrency=3)
+    analyzer = PythonAnalyzer()
+    long_code = "\n".join(f"x{i} = {i}" for i in range(100))
+
+    result = provider.suggest(long_code, analysis=analyzer.analyze_code(long_code))
+    metrics = provider.metrics_by_backend()
+    analyzer.close()
+    provider.fallback.analyzer.close()
+
+    assert result is not None
+    assert provider.fallback.max_concurrency == 3
+    assert metrics["remote"]["failures"] == 1
+    assert metrics["fallback"]["calls"] == 1
+    assert metrics["routed"]["calls"] == 1
+
+
+def test_concurrency_limit_must_be_positive():
+    """Test that a zero limit is rejected instead of deadlocking every call"""
+    with pytest.raises(ValueError):
+        RuleBasedProvider(max_concurrency=0)
+    with pytest.raises(ValueError):
+        create_provider("auto", max_concurrency=-1)
+
+
+def test_suggestion_provider_is_abstract():
+    """Test that backends must implement _suggest"""
+    with pytest.raises(TypeError):
+        SuggestionProvider()